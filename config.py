@@ -1,8 +1,17 @@
 TARGET_SERIAL = "192.168.2.12:5001"
 PKG = "com.kuaishou.nebula"
 
-# 默认参数
-STAY_MIN_DEFAULT = 32.0
-STAY_MAX_DEFAULT = 40.0
-LIKE_THRESHOLD_DEFAULT = 40
+# 默认参数（命令行、常驻引擎与 GUI 共用）
+STAY_MIN_DEFAULT = 10.0
+STAY_MAX_DEFAULT = 20.0
+LIKE_THRESHOLD_DEFAULT = 45.0
 
+# 会话日志（JSONL）目录与单文件大小上限，供 journal_analyzer.py 离线分析
+JOURNAL_DIR_DEFAULT = "journal"
+JOURNAL_MAX_BYTES = 16 * 1024 * 1024
+
+# 常驻引擎（engine_daemon.py）控制端口，仅监听本机
+ENGINE_HOST = "127.0.0.1"
+ENGINE_PORT = 50321
+# GUI 拉起引擎时 stderr 写入该文件，启动失败时在日志窗口显示
+ENGINE_LOG = "engine_daemon.log"
@@ -2,18 +2,33 @@ import subprocess
 import re
 from typing import Tuple, List, Optional
 
+from . import control
+
 
 def run(cmd: list[str], timeout: int = 10) -> tuple[int, str, str]:
-    p = subprocess.run(
+    control.checkpoint()
+    p = subprocess.Popen(
         cmd,
-        capture_output=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
         text=True,
         encoding="utf-8",
         errors="ignore",
-        timeout=timeout,
     )
-    stdout = (p.stdout or "").strip()
-    stderr = (p.stderr or "").strip()
+    # 登记到当前会话，停止时可立即杀掉正在执行的 adb 命令
+    control.track(p)
+    try:
+        out, err = p.communicate(timeout=timeout)
+    except BaseException:
+        # 同 subprocess.run：超时、Ctrl+C 等任何异常都先杀掉子进程，避免遗留 adb 进程
+        p.kill()
+        p.communicate()
+        raise
+    finally:
+        control.untrack(p)
+    control.checkpoint()
+    stdout = (out or "").strip()
+    stderr = (err or "").strip()
     return p.returncode, stdout, stderr
 
 
@@ -0,0 +1,166 @@
+import subprocess
+import threading
+import time
+from typing import Optional, Tuple
+
+
+class SessionStopped(BaseException):
+    """
+    会话被外部请求停止。
+
+    继承 BaseException（同 KeyboardInterrupt），避免被任务里宽泛的 except Exception 吞掉。
+    """
+
+
+class SessionControl:
+    """
+    常驻引擎中单个会话的控制句柄：停止 / 暂停 / 继续 / 在线调整参数。
+
+    任务代码通过模块级 checkpoint()/wait() 协作检查，停止时会同时杀掉正在执行的 adb 子进程，
+    因此无需等待 dump 等长耗时命令结束即可退出。
+    """
+
+    def __init__(self, settings: Optional[dict] = None) -> None:
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._paused = False
+        # 累计暂停秒数，用于从各步骤耗时中扣除暂停时间
+        self._paused_total = 0.0
+        self._paused_at = 0.0
+        self._procs: set[subprocess.Popen] = set()
+        self.settings: dict = dict(settings or {})
+
+    @property
+    def stopped(self) -> bool:
+        return self._stopped
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+            procs = list(self._procs)
+        for proc in procs:
+            try:
+                proc.kill()
+            except OSError:
+                pass
+
+    def paused_seconds(self) -> float:
+        """累计暂停秒数（含正在进行的暂停）"""
+        with self._cond:
+            total = self._paused_total
+            if self._paused:
+                total += time.monotonic() - self._paused_at
+            return total
+
+    def pause(self) -> None:
+        with self._cond:
+            if not self._paused:
+                self._paused = True
+                self._paused_at = time.monotonic()
+            self._cond.notify_all()
+
+    def resume(self) -> float:
+        """继续运行，返回本次暂停的秒数"""
+        with self._cond:
+            dur = 0.0
+            if self._paused:
+                dur = time.monotonic() - self._paused_at
+                self._paused_total += dur
+                self._paused = False
+            self._cond.notify_all()
+            return dur
+
+    def update(self, **settings) -> None:
+        with self._cond:
+            self.settings.update({k: v for k, v in settings.items() if v is not None})
+            self._cond.notify_all()
+
+    def checkpoint(self) -> None:
+        with self._cond:
+            while self._paused and not self._stopped:
+                self._cond.wait()
+            if self._stopped:
+                raise SessionStopped()
+
+    def wait(self, seconds: float) -> None:
+        # 暂停期间不计入等待时长
+        remaining = max(0.0, seconds)
+        with self._cond:
+            while True:
+                while self._paused and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    raise SessionStopped()
+                if remaining <= 0:
+                    return
+                t0 = time.monotonic()
+                self._cond.wait(remaining)
+                remaining -= time.monotonic() - t0
+
+    def track(self, proc: subprocess.Popen) -> None:
+        with self._cond:
+            self._procs.add(proc)
+            stopped = self._stopped
+        if stopped:
+            proc.kill()
+
+    def untrack(self, proc: subprocess.Popen) -> None:
+        with self._cond:
+            self._procs.discard(proc)
+
+
+_CONTROL: Optional[SessionControl] = None
+
+
+def set_control(control: Optional[SessionControl]) -> None:
+    """设置当前会话控制句柄；命令行直接运行时为 None，所有函数退化为普通行为"""
+    global _CONTROL
+    _CONTROL = control
+
+
+def get_control() -> Optional[SessionControl]:
+    return _CONTROL
+
+
+def checkpoint() -> None:
+    if _CONTROL is not None:
+        _CONTROL.checkpoint()
+
+
+def wait(seconds: float) -> None:
+    if _CONTROL is None:
+        time.sleep(seconds)
+        return
+    _CONTROL.wait(seconds)
+
+
+def track(proc: subprocess.Popen) -> None:
+    if _CONTROL is not None:
+        _CONTROL.track(proc)
+
+
+def untrack(proc: subprocess.Popen) -> None:
+    if _CONTROL is not None:
+        _CONTROL.untrack(proc)
+
+
+def paused_seconds() -> float:
+    if _CONTROL is None:
+        return 0.0
+    return _CONTROL.paused_seconds()
+
+
+def tuning(stay_min: float, stay_max: float, like_threshold: float) -> Tuple[float, float, float]:
+    """返回在线调整后的停留/点赞参数（未调整时原样返回）"""
+    if _CONTROL is None:
+        return stay_min, stay_max, like_threshold
+    s = _CONTROL.settings
+    stay_min = max(0.5, float(s.get("stay_min", stay_min)))
+    stay_max = max(stay_min, float(s.get("stay_max", stay_max)))
+    like_threshold = max(0.0, float(s.get("like_threshold", like_threshold)))
+    return stay_min, stay_max, like_threshold
@@ -0,0 +1,84 @@
+import json
+import socket
+from typing import Iterator, Optional
+
+from ..config import ENGINE_HOST, ENGINE_PORT
+
+
+# 协议：本机 TCP，每行一个 JSON。
+# 请求 {"cmd": "start"|"stop"|"pause"|"resume"|"configure"|"status"|"subscribe"|"shutdown", ...参数}
+# 应答 {"type": "reply", "ok": true/false, ...}；subscribe 之后持续推送 {"type": "log"|"event"|"state", ...}
+
+
+class EngineError(RuntimeError):
+    pass
+
+
+def _connect(host: str, port: int, timeout: Optional[float]) -> socket.socket:
+    sock = socket.create_connection((host, port), timeout=timeout)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    return sock
+
+
+def _send(sock: socket.socket, msg: dict) -> None:
+    sock.sendall((json.dumps(msg, ensure_ascii=False) + "\n").encode("utf-8"))
+
+
+def request(cmd: str, host: str = ENGINE_HOST, port: int = ENGINE_PORT, timeout: float = 3.0, **args) -> dict:
+    """发送一条命令并返回应答；连接失败或引擎返回 ok=false 时抛出 EngineError"""
+    try:
+        with _connect(host, port, timeout) as sock:
+            _send(sock, {"cmd": cmd, **args})
+            line = sock.makefile("r", encoding="utf-8").readline()
+    except OSError as e:
+        raise EngineError(f"无法连接引擎 {host}:{port}: {e}")
+    if not line:
+        raise EngineError("引擎未返回应答")
+    try:
+        reply = json.loads(line)
+    except ValueError:
+        raise EngineError(f"引擎应答格式错误: {line[:200]!r}")
+    if not isinstance(reply, dict):
+        raise EngineError(f"引擎应答格式错误: {line[:200]!r}")
+    if not reply.get("ok"):
+        raise EngineError(reply.get("error") or "引擎返回错误")
+    return reply
+
+
+def ping(host: str = ENGINE_HOST, port: int = ENGINE_PORT, timeout: float = 0.5) -> bool:
+    try:
+        request("status", host, port, timeout=timeout)
+        return True
+    except EngineError:
+        return False
+
+
+def subscribe(host: str = ENGINE_HOST, port: int = ENGINE_PORT, events: bool = True) -> Iterator[dict]:
+    """
+    订阅日志/状态（以及可选的结构化事件）流，连接断开时迭代结束。
+
+    第一条总是订阅时的引擎状态（type=state），此时订阅已在引擎侧生效，之后的状态变化不会遗漏。
+    """
+    try:
+        sock = _connect(host, port, 3.0)
+    except OSError as e:
+        raise EngineError(f"无法连接引擎 {host}:{port}: {e}")
+    with sock:
+        _send(sock, {"cmd": "subscribe", "events": events})
+        # 订阅是长连接，取消读超时
+        sock.settimeout(None)
+        fp = sock.makefile("r", encoding="utf-8")
+        try:
+            for line in fp:
+                try:
+                    msg = json.loads(line)
+                except ValueError:
+                    continue
+                if msg.get("type") == "reply":
+                    if not msg.get("ok"):
+                        raise EngineError(msg.get("error") or "订阅失败")
+                    msg = {k: v for k, v in msg.items() if k != "ok"}
+                    msg["type"] = "state"
+                yield msg
+        except OSError:
+            return
@@ -0,0 +1,172 @@
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, Tuple
+
+from . import control
+
+
+# 事件分类：分析器据此统计 睡眠/dump/输入/恢复 的耗时占比
+KIND_SLEEP = "sleep"
+KIND_DUMP = "dump"
+KIND_INPUT = "input"
+KIND_RECOVERY = "recovery"
+KIND_DECISION = "decision"
+KIND_SESSION = "session"
+
+JOURNAL_PREFIX = "journal-"
+JOURNAL_SUFFIX = ".jsonl"
+
+
+class Journal:
+    """
+    追加写入的会话日志（JSONL），按大小和日期自动切分文件。
+
+    每行一个事件：{"ts": 墙钟时间, "mono": 单调时钟, "run": 会话ID, "ev": 事件名, "kind": 分类, "dur": 耗时, ...}
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 16 * 1024 * 1024, run_id: Optional[str] = None) -> None:
+        self.directory = directory
+        self.max_bytes = max(1024, int(max_bytes))
+        self.run_id = run_id or uuid.uuid4().hex[:12]
+        self._lock = threading.Lock()
+        self._fp = None
+        self._day = ""
+        self._seq = 0
+        self._closed = False
+        os.makedirs(directory, exist_ok=True)
+
+    def _open_new(self) -> None:
+        if self._fp is not None:
+            self._fp.close()
+        now = time.localtime()
+        self._day = time.strftime("%Y%m%d", now)
+        self._seq += 1
+        # 文件名按时间 + 会话ID + 序号，字典序即写入顺序
+        name = f"{JOURNAL_PREFIX}{time.strftime('%Y%m%d-%H%M%S', now)}-{self.run_id}-{self._seq:04d}{JOURNAL_SUFFIX}"
+        self._fp = open(os.path.join(self.directory, name), "a", encoding="utf-8")
+
+    def _need_rotate(self) -> bool:
+        if self._fp is None:
+            return True
+        if self._fp.tell() >= self.max_bytes:
+            return True
+        return time.strftime("%Y%m%d") != self._day
+
+    def write(self, rec: dict) -> None:
+        line = json.dumps(rec, ensure_ascii=False, separators=(",", ":")) + "\n"
+        with self._lock:
+            # 其他线程可能在 close_journal() 之前拿到了本对象，关闭后的写入直接丢弃，避免重新打开文件泄漏
+            if self._closed:
+                return
+            if self._need_rotate():
+                self._open_new()
+            self._fp.write(line)
+            self._fp.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            if self._fp is not None:
+                self._fp.close()
+                self._fp = None
+
+
+_JOURNAL: Optional[Journal] = None
+_LISTENERS: list[Callable[[dict], None]] = []
+
+
+def open_journal(directory: str, max_bytes: int = 16 * 1024 * 1024, run_id: Optional[str] = None) -> Journal:
+    """打开全局日志；未打开且无订阅者时 record/span 均为空操作"""
+    global _JOURNAL
+    close_journal()
+    _JOURNAL = Journal(directory, max_bytes=max_bytes, run_id=run_id)
+    return _JOURNAL
+
+
+def close_journal() -> None:
+    global _JOURNAL
+    if _JOURNAL is not None:
+        _JOURNAL.close()
+        _JOURNAL = None
+
+
+def add_listener(fn: Callable[[dict], None]) -> None:
+    """订阅每条事件（常驻引擎用于向客户端推送事件流）"""
+    _LISTENERS.append(fn)
+
+
+def remove_listener(fn: Callable[[dict], None]) -> None:
+    if fn in _LISTENERS:
+        _LISTENERS.remove(fn)
+
+
+def record(ev: str, kind: str = KIND_DECISION, dur: Optional[float] = None, **fields) -> None:
+    journal = _JOURNAL
+    if journal is None and not _LISTENERS:
+        return
+    rec = {"ts": round(time.time(), 3), "mono": round(time.monotonic(), 4), "run": journal.run_id if journal else None, "ev": ev, "kind": kind}
+    if dur is not None:
+        rec["dur"] = round(dur, 4)
+    rec.update(fields)
+    if journal is not None:
+        try:
+            journal.write(rec)
+        except OSError:
+            # 日志写失败不影响主流程
+            pass
+    for fn in list(_LISTENERS):
+        fn(rec)
+
+
+def mark() -> Tuple[float, float]:
+    """计时起点：(单调时钟, 累计暂停秒数)，配合 elapsed() 得到扣除暂停后的耗时"""
+    return time.monotonic(), control.paused_seconds()
+
+
+def elapsed(start: Tuple[float, float]) -> float:
+    t0, p0 = start
+    return max(0.0, (time.monotonic() - t0) - (control.paused_seconds() - p0))
+
+
+@contextmanager
+def span(ev: str, kind: str, **fields) -> Iterator[dict]:
+    """
+    记录一段操作的耗时；可在 with 块内向返回的 dict 追加字段。
+
+    包裹的操作内部若还会记录 dump/点击/等待等事件，需传 nested=True，避免分析器重复统计耗时。
+    """
+    extra: dict = {}
+    start = mark()
+    ok = True
+    try:
+        yield extra
+    except control.SessionStopped:
+        # 被停止打断的步骤不算成功
+        ok = False
+        extra["stopped"] = True
+        raise
+    except Exception as e:
+        ok = False
+        extra.setdefault("err", str(e))
+        raise
+    finally:
+        record(ev, kind, elapsed(start), **{"ok": ok, **fields, **extra})
+
+
+def sleep(seconds: float, reason: str = "") -> None:
+    """带记录的等待；在常驻引擎中可被停止/暂停打断，暂停时间不计入耗时"""
+    start = mark()
+    control.wait(seconds)
+    record("sleep", KIND_SLEEP, elapsed(start), reason=reason)
+
+
+def iter_journal_files(directory: str) -> list[str]:
+    """按文件名（即时间）排序返回目录下所有日志文件"""
+    if os.path.isfile(directory):
+        return [directory]
+    names = sorted(n for n in os.listdir(directory) if n.startswith(JOURNAL_PREFIX) and n.endswith(JOURNAL_SUFFIX))
+    return [os.path.join(directory, n) for n in names]
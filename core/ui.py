@@ -1,8 +1,9 @@
 import re
-import time
 from typing import Optional, Tuple
 
 from .adb_utils import adb_shell
+from .journal import record, mark, elapsed, KIND_DUMP, KIND_RECOVERY
+from . import control
 
 
 def parse_bounds(bounds_str: str) -> Tuple[int, int, int, int]:
@@ -15,16 +16,22 @@ def parse_bounds(bounds_str: str) -> Tuple[int, int, int, int]:
 
 def dump_ui_xml(serial: str, retries: int = 3) -> str:
     last_err = ""
-    for _ in range(max(1, retries)):
+    attempts = max(1, retries)
+    for attempt in range(1, attempts + 1):
+        start = mark()
         try:
             adb_shell(serial, "uiautomator dump --compressed /sdcard/uidump.xml", timeout=25)
             code, out, err = adb_shell(serial, "cat /sdcard/uidump.xml", timeout=10)
             if code == 0 and out.strip().startswith("<?xml"):
+                record("dump", KIND_DUMP, elapsed(start), attempt=attempt, bytes=len(out))
                 return out
             last_err = err or out
         except Exception as e:
             last_err = str(e)
-        time.sleep(0.8)
+        control.wait(0.8)
+        # 失败的尝试（含重试等待）计入恢复耗时
+        record("dump_retry", KIND_RECOVERY, elapsed(start), attempt=attempt, err=last_err[:200])
+    record("dump_failed", KIND_RECOVERY, attempts=attempts, err=last_err[:200])
     raise RuntimeError(f"dump xml 失败: {last_err}")
 
 
@@ -0,0 +1,87 @@
+import sys
+import json
+import argparse
+try:
+    from scripts.core.engine_client import request, subscribe, EngineError
+    from scripts.config import ENGINE_HOST, ENGINE_PORT
+except ModuleNotFoundError:
+    # 兼容直接运行脚本：python scripts/engine_ctl.py
+    import os as _os, sys as _sys
+    _sys.path.append(_os.path.dirname(_os.path.dirname(__file__)))
+    from scripts.core.engine_client import request, subscribe, EngineError
+    from scripts.config import ENGINE_HOST, ENGINE_PORT
+
+
+def _print_status(reply: dict) -> None:
+    settings = reply.get("settings") or {}
+    print(f"状态: {reply.get('state')}  会话: {reply.get('session') or '-'}  上次退出码: {reply.get('last_code')}")
+    if settings:
+        print("参数: " + "  ".join(f"{k}={v}" for k, v in settings.items()))
+    if reply.get("devices"):
+        print("已缓存设备: " + ", ".join(reply["devices"]))
+
+
+def _watch(host: str, port: int, events: bool) -> int:
+    try:
+        for msg in subscribe(host, port, events=events):
+            kind = msg.pop("type", "")
+            if kind == "log":
+                print(msg.get("line", ""))
+            elif kind == "state":
+                print(f"[状态] {msg.get('state')}")
+            elif kind == "event":
+                print("[事件] " + json.dumps(msg, ensure_ascii=False))
+    except KeyboardInterrupt:
+        return 0
+    print("[引擎连接已断开]")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Kuaishou engine control client")
+    parser.add_argument("--host", dest="host", default=ENGINE_HOST, help=f"引擎地址，默认 {ENGINE_HOST}")
+    parser.add_argument("--port", dest="port", type=int, default=ENGINE_PORT, help=f"引擎端口，默认 {ENGINE_PORT}")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_start = sub.add_parser("start", help="启动一个会话")
+    p_start.add_argument("--serial", dest="serial", default=None, help="ADB 设备地址，缺省则自动选择")
+    p_start.add_argument("--stay-min", dest="stay_min", type=float, default=None, help="每条视频随机停留的最短秒数，缺省沿用引擎当前参数")
+    p_start.add_argument("--stay-max", dest="stay_max", type=float, default=None, help="每条视频随机停留的最长秒数，缺省沿用引擎当前参数")
+    p_start.add_argument("--like-threshold", dest="like_threshold", type=float, default=None, help="当停留秒数大于等于该阈值时尝试点赞，缺省沿用引擎当前参数")
+    p_start.add_argument("--watch", dest="watch", action="store_true", help="启动后持续输出日志")
+
+    p_conf = sub.add_parser("configure", help="调整参数：运行中下一条视频生效，空闲时作为下次 start 的默认值")
+    p_conf.add_argument("--stay-min", dest="stay_min", type=float, default=None)
+    p_conf.add_argument("--stay-max", dest="stay_max", type=float, default=None)
+    p_conf.add_argument("--like-threshold", dest="like_threshold", type=float, default=None)
+
+    p_watch = sub.add_parser("watch", help="订阅日志与状态")
+    p_watch.add_argument("--events", dest="events", action="store_true", help="同时输出结构化事件")
+
+    for name, desc in (("stop", "停止当前会话"), ("pause", "暂停当前会话"), ("resume", "继续当前会话"), ("status", "查看引擎状态"), ("shutdown", "停止会话并退出引擎")):
+        sub.add_parser(name, help=desc)
+    args = parser.parse_args()
+
+    try:
+        if args.cmd == "watch":
+            return _watch(args.host, args.port, args.events)
+        if args.cmd == "start":
+            params = {"serial": args.serial, "stay_min": args.stay_min, "stay_max": args.stay_max, "like_threshold": args.like_threshold}
+            reply = request("start", args.host, args.port, **{k: v for k, v in params.items() if v is not None})
+            _print_status(reply)
+            if args.watch:
+                return _watch(args.host, args.port, False)
+            return 0
+        if args.cmd == "configure":
+            reply = request("configure", args.host, args.port, stay_min=args.stay_min, stay_max=args.stay_max, like_threshold=args.like_threshold)
+        else:
+            reply = request(args.cmd, args.host, args.port)
+        _print_status(reply)
+        return 0
+    except EngineError as e:
+        print(f"执行失败: {e}")
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+import sys
+import json
+import uuid
+import queue
+import argparse
+import threading
+import socket
+import socketserver
+from typing import Optional
+try:
+    from scripts.kuaishou_to_my import run_session
+    from scripts.core import journal, control
+    from scripts.core.control import SessionControl
+    from scripts.config import ENGINE_HOST, ENGINE_PORT, JOURNAL_DIR_DEFAULT, JOURNAL_MAX_BYTES, STAY_MIN_DEFAULT, STAY_MAX_DEFAULT, LIKE_THRESHOLD_DEFAULT
+except ModuleNotFoundError:
+    # 兼容直接运行脚本：python scripts/engine_daemon.py
+    import os as _os, sys as _sys
+    _sys.path.append(_os.path.dirname(_os.path.dirname(__file__)))
+    from scripts.kuaishou_to_my import run_session
+    from scripts.core import journal, control
+    from scripts.core.control import SessionControl
+    from scripts.config import ENGINE_HOST, ENGINE_PORT, JOURNAL_DIR_DEFAULT, JOURNAL_MAX_BYTES, STAY_MIN_DEFAULT, STAY_MAX_DEFAULT, LIKE_THRESHOLD_DEFAULT
+
+
+STATE_IDLE = "idle"
+STATE_RUNNING = "running"
+STATE_PAUSED = "paused"
+STATE_STOPPING = "stopping"
+
+
+class _Subscriber:
+    def __init__(self, events: bool) -> None:
+        self.events = events
+        # 有界队列：客户端读得慢时丢弃，不拖慢会话线程
+        self.queue: "queue.Queue[Optional[dict]]" = queue.Queue(maxsize=2000)
+
+    def put(self, msg: Optional[dict]) -> None:
+        try:
+            self.queue.put_nowait(msg)
+        except queue.Full:
+            pass
+
+
+class _LogTee:
+    """替换 sys.stdout：原样输出的同时把每行 print 作为 log 消息推送给订阅者"""
+
+    def __init__(self, engine: "Engine", stream) -> None:
+        self._engine = engine
+        self._stream = stream
+        self._buf = ""
+        self._lock = threading.Lock()
+
+    def write(self, s: str) -> int:
+        if self._stream is not None:
+            try:
+                self._stream.write(s)
+            except (OSError, ValueError):
+                pass
+        with self._lock:
+            self._buf += s
+            lines = self._buf.split("\n")
+            self._buf = lines.pop()
+        for line in lines:
+            self._engine.publish({"type": "log", "line": line})
+        return len(s)
+
+    def flush(self) -> None:
+        if self._stream is not None:
+            try:
+                self._stream.flush()
+            except (OSError, ValueError):
+                pass
+
+
+class Engine:
+    """
+    常驻引擎：同一时间运行一个会话，跨会话保持解释器、adb 连接与设备分辨率缓存。
+
+    会话在后台线程中运行，停止/暂停/调参通过 SessionControl 协作完成，控制命令立即返回。
+    """
+
+    def __init__(self, journal_dir: str = JOURNAL_DIR_DEFAULT) -> None:
+        self.journal_dir = journal_dir
+        # _lock 保护会话状态切换，_subs_lock 保护订阅者列表
+        self._lock = threading.Lock()
+        self._subs_lock = threading.Lock()
+        self._subs: list[_Subscriber] = []
+        self._thread: Optional[threading.Thread] = None
+        self._control: Optional[SessionControl] = None
+        self.session_id: Optional[str] = None
+        self.state = STATE_IDLE
+        # 空闲时 configure 的参数保存在此，作为下次 start 未指定参数时的默认值
+        self.settings: dict = {"serial": None, "stay_min": STAY_MIN_DEFAULT, "stay_max": STAY_MAX_DEFAULT, "like_threshold": LIKE_THRESHOLD_DEFAULT}
+        self.last_code: Optional[int] = None
+        self.screen_sizes: dict = {}
+        journal.add_listener(self._on_event)
+
+    # ---- 事件推送 ----
+    def publish(self, msg: dict) -> None:
+        with self._subs_lock:
+            subs = list(self._subs)
+        for sub in subs:
+            if msg.get("type") == "event" and not sub.events:
+                continue
+            sub.put(msg)
+
+    def _on_event(self, rec: dict) -> None:
+        self.publish({"type": "event", **rec})
+
+    def _set_state(self, state: str) -> None:
+        # 调用方需持有 _lock
+        self.state = state
+        self.publish({"type": "state", **self.status()})
+
+    def subscribe(self, events: bool = True) -> _Subscriber:
+        sub = _Subscriber(events)
+        with self._subs_lock:
+            self._subs.append(sub)
+        return sub
+
+    def unsubscribe(self, sub: _Subscriber) -> None:
+        with self._subs_lock:
+            if sub in self._subs:
+                self._subs.remove(sub)
+
+    # ---- 会话控制 ----
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "session": self.session_id,
+            # 空闲时以 self.settings（含 configure 的修改）为准，运行中以会话的在线参数为准
+            "settings": dict(self._control.settings) if self._control and self.state != STATE_IDLE else dict(self.settings),
+            "last_code": self.last_code,
+            "devices": sorted(self.screen_sizes),
+        }
+
+    def start(self, serial: Optional[str] = None, stay_min: Optional[float] = None, stay_max: Optional[float] = None, like_threshold: Optional[float] = None) -> dict:
+        """启动会话；未指定的停留/点赞参数沿用上次会话或 configure 设置的值"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                raise RuntimeError(f"已有会话在运行（{self.state}），请先停止")
+            stay_min = max(0.5, float(self.settings["stay_min"] if stay_min is None else stay_min))
+            stay_max = max(stay_min, float(self.settings["stay_max"] if stay_max is None else stay_max))
+            like_threshold = max(0.0, float(self.settings["like_threshold"] if like_threshold is None else like_threshold))
+            self.settings = {"serial": serial, "stay_min": stay_min, "stay_max": stay_max, "like_threshold": like_threshold}
+            self.session_id = uuid.uuid4().hex[:12]
+            self._control = SessionControl(self.settings)
+            self._thread = threading.Thread(target=self._run, args=(self._control, self.session_id, dict(self.settings)), daemon=True)
+            self._set_state(STATE_RUNNING)
+            self._thread.start()
+            return self.status()
+
+    def _run(self, ctl: SessionControl, session_id: str, settings: dict) -> None:
+        control.set_control(ctl)
+        if self.journal_dir:
+            journal.open_journal(self.journal_dir, max_bytes=JOURNAL_MAX_BYTES, run_id=session_id)
+        code = 1
+        try:
+            code = run_session(settings["serial"], settings["stay_min"], settings["stay_max"], settings["like_threshold"], screen_sizes=self.screen_sizes)
+        except Exception as e:
+            print(f"[引擎] 会话异常: {e!r}")
+        finally:
+            journal.close_journal()
+            control.set_control(None)
+            print(f"[会话已结束] 退出码: {code}")
+            with self._lock:
+                self.last_code = code
+                if self._control is ctl:
+                    self._control = None
+                self._set_state(STATE_IDLE)
+
+    def stop(self) -> dict:
+        with self._lock:
+            ctl = self._control
+            if ctl is None or self.state in (STATE_IDLE, STATE_STOPPING):
+                return self.status()
+            # 仅置位并杀掉在途 adb 命令，不等待会话线程退出
+            ctl.stop()
+            self._set_state(STATE_STOPPING)
+            return self.status()
+
+    def pause(self) -> dict:
+        with self._lock:
+            ctl = self._control
+            if ctl is None or self.state != STATE_RUNNING:
+                raise RuntimeError(f"当前状态 {self.state} 不能暂停")
+            ctl.pause()
+            # 分析器据 pause/resume 把暂停区间从有效运行时长中扣除
+            journal.record("pause", journal.KIND_SESSION)
+            self._set_state(STATE_PAUSED)
+            return self.status()
+
+    def resume(self) -> dict:
+        with self._lock:
+            ctl = self._control
+            if ctl is None or self.state != STATE_PAUSED:
+                raise RuntimeError(f"当前状态 {self.state} 不能继续")
+            paused = ctl.resume()
+            journal.record("resume", journal.KIND_SESSION, paused)
+            self._set_state(STATE_RUNNING)
+            return self.status()
+
+    def configure(self, stay_min: Optional[float] = None, stay_max: Optional[float] = None, like_threshold: Optional[float] = None) -> dict:
+        """调整停留/点赞参数：运行中的会话从下一条视频起生效，空闲时作为下次 start 的默认值"""
+        updates = {"stay_min": stay_min, "stay_max": stay_max, "like_threshold": like_threshold}
+        updates = {k: float(v) for k, v in updates.items() if v is not None}
+        with self._lock:
+            self.settings.update(updates)
+            ctl = self._control
+            if ctl is not None and self.state != STATE_IDLE:
+                ctl.update(**updates)
+            self.publish({"type": "state", **self.status()})
+            return self.status()
+
+    def close(self) -> None:
+        self.stop()
+        t = self._thread
+        if t is not None:
+            t.join(timeout=5.0)
+        with self._subs_lock:
+            subs = list(self._subs)
+        for sub in subs:
+            sub.put(None)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: "EngineServer"
+
+    def _send(self, msg: dict) -> None:
+        self.wfile.write((json.dumps(msg, ensure_ascii=False) + "\n").encode("utf-8"))
+        self.wfile.flush()
+
+    def handle(self) -> None:
+        engine = self.server.engine
+        for raw in self.rfile:
+            try:
+                req = json.loads(raw.decode("utf-8"))
+                cmd = req.pop("cmd", "")
+            except (ValueError, AttributeError):
+                self._send({"type": "reply", "ok": False, "error": "请求格式错误"})
+                continue
+            if cmd == "subscribe":
+                self._stream(engine, bool(req.get("events", True)))
+                return
+            try:
+                if cmd == "start":
+                    result = engine.start(req.get("serial"), req.get("stay_min"), req.get("stay_max"), req.get("like_threshold"))
+                elif cmd == "stop":
+                    result = engine.stop()
+                elif cmd == "pause":
+                    result = engine.pause()
+                elif cmd == "resume":
+                    result = engine.resume()
+                elif cmd == "configure":
+                    result = engine.configure(req.get("stay_min"), req.get("stay_max"), req.get("like_threshold"))
+                elif cmd == "status":
+                    result = engine.status()
+                elif cmd == "shutdown":
+                    result = engine.status()
+                    threading.Thread(target=self.server.close, daemon=True).start()
+                else:
+                    raise RuntimeError(f"未知命令: {cmd}")
+            except (RuntimeError, TypeError, ValueError) as e:
+                self._send({"type": "reply", "ok": False, "error": str(e)})
+                continue
+            self._send({"type": "reply", "ok": True, **result})
+
+    def _stream(self, engine: Engine, events: bool) -> None:
+        sub = engine.subscribe(events)
+        try:
+            self._send({"type": "reply", "ok": True, **engine.status()})
+            while True:
+                msg = sub.queue.get()
+                if msg is None:
+                    return
+                self._send(msg)
+        except OSError:
+            return
+        finally:
+            engine.unsubscribe(sub)
+
+
+class EngineServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    # Windows 的 SO_REUSEADDR 允许重复绑定同一端口，会导致第二个引擎静默启动，改用独占绑定
+    allow_reuse_address = sys.platform != "win32"
+
+    def __init__(self, engine: Engine, host: str = ENGINE_HOST, port: int = ENGINE_PORT) -> None:
+        self.engine = engine
+        super().__init__((host, port), _Handler)
+
+    def server_bind(self) -> None:
+        if hasattr(socket, "SO_EXCLUSIVEADDRUSE"):
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_EXCLUSIVEADDRUSE, 1)
+        super().server_bind()
+
+    def close(self) -> None:
+        self.engine.close()
+        self.shutdown()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Kuaishou engine daemon")
+    parser.add_argument("--host", dest="host", default=ENGINE_HOST, help=f"监听地址，默认 {ENGINE_HOST}")
+    parser.add_argument("--port", dest="port", type=int, default=ENGINE_PORT, help=f"监听端口，默认 {ENGINE_PORT}")
+    parser.add_argument("--journal-dir", dest="journal_dir", default=JOURNAL_DIR_DEFAULT, help="会话日志目录（JSONL，自动切分），传空字符串则不记录")
+    args = parser.parse_args()
+
+    engine = Engine(args.journal_dir)
+    try:
+        server = EngineServer(engine, args.host, args.port)
+    except OSError as e:
+        print(f"引擎启动失败（端口 {args.port} 可能已被占用）: {e}")
+        return 1
+    sys.stdout = _LogTee(engine, sys.stdout)
+    print(f"[引擎] 已启动，监听 {args.host}:{args.port}")
+    try:
+        server.serve_forever(poll_interval=0.2)
+    except KeyboardInterrupt:
+        engine.close()
+    finally:
+        server.server_close()
+    print("[引擎] 已退出")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,32 +7,42 @@ import time
 import shutil
 import tkinter as tk
 import tkinter.scrolledtext as st
+try:
+    from scripts.core import engine_client
+    from scripts.config import ENGINE_LOG, STAY_MIN_DEFAULT, STAY_MAX_DEFAULT, LIKE_THRESHOLD_DEFAULT
+except ModuleNotFoundError:
+    # 兼容直接运行脚本：python scripts/gui_launcher.py
+    sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from scripts.core import engine_client
+    from scripts.config import ENGINE_LOG, STAY_MIN_DEFAULT, STAY_MAX_DEFAULT, LIKE_THRESHOLD_DEFAULT
 
 
-def resolve_script_path() -> str | None:
+def resolve_script_path(name: str = "engine_daemon.py") -> str | None:
     # 优先：源码路径（开发态）
-    dev_path = os.path.join(os.path.dirname(__file__), "kuaishou_to_my.py")
+    dev_path = os.path.join(os.path.dirname(__file__), name)
     if os.path.isfile(dev_path):
         return dev_path
     # PyInstaller 一体化打包后，资源会被解压到 sys._MEIPASS
     meipass = getattr(sys, "_MEIPASS", None)
     if meipass:
-        cand_mei = os.path.join(meipass, "kuaishou_to_my.py")
+        cand_mei = os.path.join(meipass, name)
         if os.path.isfile(cand_mei):
             return cand_mei
     # 冻结后：exe 同目录/scripts 下
     exe_dir = os.path.dirname(sys.executable)
-    cand1 = os.path.join(exe_dir, "scripts", "kuaishou_to_my.py")
+    cand1 = os.path.join(exe_dir, "scripts", name)
     if os.path.isfile(cand1):
         return cand1
     # 冻结后：exe 同目录
-    cand2 = os.path.join(exe_dir, "kuaishou_to_my.py")
+    cand2 = os.path.join(exe_dir, name)
     if os.path.isfile(cand2):
         return cand2
     return None
 
-SCRIPT_PATH = resolve_script_path()
-CURRENT_PROC: subprocess.Popen | None = None
+DAEMON_PATH = resolve_script_path("engine_daemon.py")
+ENGINE_PROC: subprocess.Popen | None = None
+WATCHER: threading.Thread | None = None
+LOG_QUEUE: "queue.Queue[str]" = queue.Queue()
 
 
 def resolve_python_cmd() -> list[str]:
@@ -49,64 +59,123 @@ def resolve_python_cmd() -> list[str]:
     return [sys.executable]
 
 
-def run_script(output_queue: "queue.Queue[str]", serial_value: str | None, stay_min: float | None, stay_max: float | None, like_threshold: float | None) -> None:
-    # 使用当前 Python 解释器启动原脚本，并实时读取输出
-    global CURRENT_PROC
+def ensure_engine(output_queue: "queue.Queue[str]") -> bool:
+    # 常驻引擎已在运行则直接复用（设备连接与缓存保持热状态），否则后台拉起一次
+    global ENGINE_PROC
+    if engine_client.ping():
+        return True
     py_cmd = resolve_python_cmd()
-    if SCRIPT_PATH is None:
-        output_queue.put("未找到 kuaishou_to_my.py。请将该文件放在 exe 同目录或其 scripts 子目录下。")
-        output_queue.put("__ENABLE_START__")
-        return
+    if DAEMON_PATH is None:
+        output_queue.put("未找到 engine_daemon.py。请将该文件放在 exe 同目录或其 scripts 子目录下。")
+        return False
     if not py_cmd:
         output_queue.put("未找到可用的 Python 解释器，请确保已安装并在 PATH 中。")
-        output_queue.put("__ENABLE_START__")
-        return
-    cmd = [*py_cmd, SCRIPT_PATH]
-    if serial_value:
-        cmd += ["--serial", serial_value]
-    if stay_min is not None:
-        cmd += ["--stay-min", str(stay_min)]
-    if stay_max is not None:
-        cmd += ["--stay-max", str(stay_max)]
-    if like_threshold is not None:
-        cmd += ["--like-threshold", str(like_threshold)]
-    # 打印启动命令
-    output_queue.put("[启动] " + " ".join(cmd))
-    # Windows 下抑制控制台弹窗 + 强制子进程无缓冲输出
+        return False
+    cmd = [*py_cmd, DAEMON_PATH]
+    log_path = os.path.abspath(ENGINE_LOG)
+    output_queue.put("[启动引擎] " + " ".join(cmd))
+    # Windows 下抑制控制台弹窗；运行日志通过控制端口推送，stderr 写入文件以便启动失败时查看
     creationflags = getattr(subprocess, "CREATE_NO_WINDOW", 0)
     env = os.environ.copy()
     env["PYTHONUNBUFFERED"] = "1"
-    # 强制子进程以 UTF-8 输出，避免中文乱码
     env["PYTHONIOENCODING"] = "utf-8"
     try:
-        proc = subprocess.Popen(
-            cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT,
-            text=True,
-            encoding="utf-8",
-            errors="ignore",
-            creationflags=creationflags,
-            bufsize=1,
-            env=env,
-        )
+        with open(log_path, "w", encoding="utf-8") as log_fp:
+            ENGINE_PROC = subprocess.Popen(
+                cmd,
+                stdout=subprocess.DEVNULL,
+                stderr=log_fp,
+                creationflags=creationflags,
+                env=env,
+            )
     except Exception as e:
         output_queue.put(f"[启动失败] {e}")
-        output_queue.put("__ENABLE_START__")
+        return False
+    for _ in range(100):  # 等待最多10秒
+        if engine_client.ping():
+            return True
+        if ENGINE_PROC.poll() is not None:
+            output_queue.put(f"[引擎已退出] 退出码: {ENGINE_PROC.returncode}")
+            put_engine_log(output_queue, log_path)
+            return False
+        time.sleep(0.1)
+    output_queue.put("[启动失败] 等待引擎就绪超时")
+    put_engine_log(output_queue, log_path)
+    return False
+
+
+def put_engine_log(output_queue: "queue.Queue[str]", log_path: str, max_lines: int = 40) -> None:
+    # 把引擎 stderr（如导入失败的 traceback）显示到日志窗口
+    try:
+        with open(log_path, "r", encoding="utf-8", errors="ignore") as fp:
+            lines = fp.read().splitlines()
+    except OSError:
         return
-    CURRENT_PROC = proc
+    if not lines:
+        return
+    output_queue.put(f"[引擎错误输出] {log_path}")
+    for line in lines[-max_lines:]:
+        output_queue.put(line)
+
+
+STATE_SIGNALS = {"idle": "__ENABLE_START__", "running": "__RUNNING__", "paused": "__PAUSED__", "stopping": "__STOPPING__"}
+
+
+def watch_engine(output_queue: "queue.Queue[str]", ready: threading.Event) -> None:
+    # 订阅引擎日志与状态，转发到界面队列；首条消息为订阅时的状态，收到即说明订阅已生效
     try:
-        assert proc.stdout is not None
-        for line in proc.stdout:
-            output_queue.put(line.rstrip("\n"))
+        for msg in engine_client.subscribe(events=False):
+            kind = msg.get("type")
+            if kind == "log":
+                output_queue.put(msg.get("line", ""))
+            elif kind == "state":
+                signal = STATE_SIGNALS.get(msg.get("state", ""))
+                if signal:
+                    output_queue.put(signal)
+            ready.set()
+    except engine_client.EngineError as e:
+        output_queue.put(f"[订阅失败] {e}")
     finally:
-        code = proc.wait()
-        CURRENT_PROC = None
-        output_queue.put(f"[进程已退出] 退出码: {code}")
+        ready.set()
+        output_queue.put("[引擎连接已断开]")
         output_queue.put("__ENABLE_START__")
 
 
-def pump_logs(text_widget: st.ScrolledText, output_queue: "queue.Queue[str]", start_button: tk.Button, stop_button: tk.Button) -> None:
+def start_watcher(output_queue: "queue.Queue[str]") -> None:
+    # 确保订阅已建立后再返回，避免 start 的状态广播先于订阅而丢失
+    global WATCHER
+    if WATCHER is not None and WATCHER.is_alive():
+        return
+    ready = threading.Event()
+    WATCHER = threading.Thread(target=watch_engine, args=(output_queue, ready), daemon=True)
+    WATCHER.start()
+    ready.wait(3.0)
+
+
+def attach_engine(output_queue: "queue.Queue[str]") -> None:
+    # 窗口启动时若引擎已在运行（例如上次关闭窗口后会话仍在跑），直接订阅并按其状态恢复按钮
+    if engine_client.ping():
+        output_queue.put("[已连接到运行中的引擎]")
+        start_watcher(output_queue)
+
+
+def run_script(output_queue: "queue.Queue[str]", serial_value: str | None, stay_min: float | None, stay_max: float | None, like_threshold: float | None) -> None:
+    # 通过控制端口让常驻引擎启动会话，日志由 watch_engine 推送
+    if not ensure_engine(output_queue):
+        output_queue.put("__ENABLE_START__")
+        return
+    start_watcher(output_queue)
+    params = {"serial": serial_value, "stay_min": stay_min, "stay_max": stay_max, "like_threshold": like_threshold}
+    params = {k: v for k, v in params.items() if v is not None}
+    output_queue.put("[启动] " + " ".join(f"{k}={v}" for k, v in params.items()))
+    try:
+        engine_client.request("start", **params)
+    except engine_client.EngineError as e:
+        output_queue.put(f"[启动失败] {e}")
+        output_queue.put("__ENABLE_START__")
+
+
+def pump_logs(text_widget: st.ScrolledText, output_queue: "queue.Queue[str]", start_button: tk.Button, stop_button: tk.Button, pause_button: tk.Button) -> None:
     # 将队列中的日志刷到文本框
     try:
         while True:
@@ -114,53 +183,74 @@ def pump_logs(text_widget: st.ScrolledText, output_queue: "queue.Queue[str]", st
             if line == "__ENABLE_START__":
                 start_button.config(state=tk.NORMAL)
                 stop_button.config(state=tk.DISABLED)
+                pause_button.config(state=tk.DISABLED, text="暂停")
+            elif line == "__PAUSED__":
+                start_button.config(state=tk.DISABLED)
+                stop_button.config(state=tk.NORMAL)
+                pause_button.config(state=tk.NORMAL, text="继续")
+            elif line == "__STOPPING__":
+                start_button.config(state=tk.DISABLED)
+                stop_button.config(state=tk.DISABLED)
+                pause_button.config(state=tk.DISABLED)
+            elif line == "__RUNNING__":
+                start_button.config(state=tk.DISABLED)
+                stop_button.config(state=tk.NORMAL)
+                pause_button.config(state=tk.NORMAL, text="暂停")
             else:
                 text_widget.insert(tk.END, line + "\n")
                 text_widget.see(tk.END)
     except Exception:
         pass
-    text_widget.after(100, pump_logs, text_widget, output_queue, start_button, stop_button)
+    text_widget.after(100, pump_logs, text_widget, output_queue, start_button, stop_button, pause_button)
 
 
-def start_run(start_button: tk.Button, stop_button: tk.Button, text_widget: st.ScrolledText, serial_entry: tk.Entry, stay_min_entry: tk.Entry, stay_max_entry: tk.Entry, like_entry: tk.Entry) -> None:
+def parse_float(entry: tk.Entry) -> float | None:
+    s = entry.get().strip()
+    if s == "":
+        return None
+    try:
+        return float(s)
+    except Exception:
+        return None
+
+
+def start_run(start_button: tk.Button, stop_button: tk.Button, serial_entry: tk.Entry, stay_min_entry: tk.Entry, stay_max_entry: tk.Entry, like_entry: tk.Entry) -> None:
     start_button.config(state=tk.DISABLED)
     stop_button.config(state=tk.NORMAL)
-    q: "queue.Queue[str]" = queue.Queue()
     serial_value = serial_entry.get().strip()
     if serial_value == "":
         serial_value = None
-    def parse_float(entry: tk.Entry) -> float | None:
-        s = entry.get().strip()
-        if s == "":
-            return None
-        try:
-            return float(s)
-        except Exception:
-            return None
     stay_min = parse_float(stay_min_entry)
     stay_max = parse_float(stay_max_entry)
     like_threshold = parse_float(like_entry)
-    t = threading.Thread(target=run_script, args=(q, serial_value, stay_min, stay_max, like_threshold), daemon=True)
+    t = threading.Thread(target=run_script, args=(LOG_QUEUE, serial_value, stay_min, stay_max, like_threshold), daemon=True)
     t.start()
-    pump_logs(text_widget, q, start_button, stop_button)
 
 
-def stop_run(start_button: tk.Button, stop_button: tk.Button, text_widget: st.ScrolledText) -> None:
-    global CURRENT_PROC
-    if CURRENT_PROC is None:
-        return
+def send_command(text_widget: st.ScrolledText, cmd: str, **params) -> None:
+    # 控制命令由引擎立即应答，无需等待会话退出
+    try:
+        engine_client.request(cmd, timeout=1.0, **params)
+    except engine_client.EngineError as e:
+        text_widget.insert(tk.END, f"[{cmd} 失败] {e}\n")
+        text_widget.see(tk.END)
+
+
+def stop_run(text_widget: st.ScrolledText) -> None:
     text_widget.insert(tk.END, "请求停止运行…\n")
     text_widget.see(tk.END)
-    try:
-        CURRENT_PROC.terminate()
-        for _ in range(20):  # 等待最多2秒
-            if CURRENT_PROC.poll() is not None:
-                break
-            time.sleep(0.1)
-        if CURRENT_PROC.poll() is None:
-            CURRENT_PROC.kill()
-    except Exception as _:
-        pass
+    send_command(text_widget, "stop")
+
+
+def toggle_pause(pause_button: tk.Button, text_widget: st.ScrolledText) -> None:
+    send_command(text_widget, "resume" if pause_button.cget("text") == "继续" else "pause")
+
+
+def apply_params(text_widget: st.ScrolledText, stay_min_entry: tk.Entry, stay_max_entry: tk.Entry, like_entry: tk.Entry) -> None:
+    params = {"stay_min": parse_float(stay_min_entry), "stay_max": parse_float(stay_max_entry), "like_threshold": parse_float(like_entry)}
+    text_widget.insert(tk.END, "[调整参数] " + " ".join(f"{k}={v}" for k, v in params.items() if v is not None) + "\n")
+    text_widget.see(tk.END)
+    send_command(text_widget, "configure", **{k: v for k, v in params.items() if v is not None})
 
 
 def main() -> None:
@@ -177,32 +267,41 @@ def main() -> None:
 
     tk.Label(top_frame, text="停留最短(s):").pack(side=tk.LEFT)
     stay_min_entry = tk.Entry(top_frame, width=8)
-    stay_min_entry.insert(0, "3")
+    stay_min_entry.insert(0, f"{STAY_MIN_DEFAULT:g}")
     stay_min_entry.pack(side=tk.LEFT, padx=(4, 8))
 
     tk.Label(top_frame, text="停留最长(s):").pack(side=tk.LEFT)
     stay_max_entry = tk.Entry(top_frame, width=8)
-    stay_max_entry.insert(0, "20")
+    stay_max_entry.insert(0, f"{STAY_MAX_DEFAULT:g}")
     stay_max_entry.pack(side=tk.LEFT, padx=(4, 8))
 
     tk.Label(top_frame, text="点赞阈值(s):").pack(side=tk.LEFT)
     like_entry = tk.Entry(top_frame, width=8)
-    like_entry.insert(0, "15")
+    like_entry.insert(0, f"{LIKE_THRESHOLD_DEFAULT:g}")
     like_entry.pack(side=tk.LEFT, padx=(4, 8))
     start_btn = tk.Button(top_frame, text="开始运行", width=12)
     start_btn.pack(side=tk.LEFT)
     stop_btn = tk.Button(top_frame, text="停止运行", width=12, state=tk.DISABLED)
     stop_btn.pack(side=tk.LEFT, padx=(8, 0))
+    pause_btn = tk.Button(top_frame, text="暂停", width=8, state=tk.DISABLED)
+    pause_btn.pack(side=tk.LEFT, padx=(8, 0))
+    apply_btn = tk.Button(top_frame, text="应用参数", width=10)
+    apply_btn.pack(side=tk.LEFT, padx=(8, 0))
 
     text = st.ScrolledText(root, width=120, height=34)
     text.pack(fill=tk.BOTH, expand=True, padx=8, pady=(0, 8))
 
-    start_btn.configure(command=lambda: start_run(start_btn, stop_btn, text, serial_entry, stay_min_entry, stay_max_entry, like_entry))
-    stop_btn.configure(command=lambda: stop_run(start_btn, stop_btn, text))
+    start_btn.configure(command=lambda: start_run(start_btn, stop_btn, serial_entry, stay_min_entry, stay_max_entry, like_entry))
+    stop_btn.configure(command=lambda: stop_run(text))
+    pause_btn.configure(command=lambda: toggle_pause(pause_btn, text))
+    apply_btn.configure(command=lambda: apply_params(text, stay_min_entry, stay_max_entry, like_entry))
 
     # 初始提示
     text.insert(tk.END, "点击‘开始运行’以启动脚本并在此窗口查看日志。ADB 地址留空则使用脚本默认值。\n")
+    text.insert(tk.END, "脚本由后台常驻引擎执行，关闭本窗口不会停止引擎；运行中可暂停或点击‘应用参数’在线调整停留时间。\n")
     text.see(tk.END)
+    pump_logs(text, LOG_QUEUE, start_btn, stop_btn, pause_btn)
+    threading.Thread(target=attach_engine, args=(LOG_QUEUE,), daemon=True).start()
 
     root.mainloop()
 
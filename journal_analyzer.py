@@ -0,0 +1,211 @@
+import sys
+import json
+import time
+import heapq
+import argparse
+from typing import Iterator
+try:
+    from scripts.core.journal import iter_journal_files, KIND_SLEEP, KIND_DUMP, KIND_INPUT, KIND_RECOVERY
+    from scripts.config import JOURNAL_DIR_DEFAULT
+except ModuleNotFoundError:
+    # 兼容直接运行脚本：python scripts/journal_analyzer.py
+    import os as _os, sys as _sys
+    _sys.path.append(_os.path.dirname(_os.path.dirname(__file__)))
+    from scripts.core.journal import iter_journal_files, KIND_SLEEP, KIND_DUMP, KIND_INPUT, KIND_RECOVERY
+    from scripts.config import JOURNAL_DIR_DEFAULT
+
+
+TIME_KINDS = (KIND_SLEEP, KIND_DUMP, KIND_INPUT, KIND_RECOVERY)
+
+
+def iter_events(paths: list[str]) -> Iterator[dict]:
+    """逐行读取日志，坏行（如进程被杀时写了一半）直接跳过"""
+    for path in paths:
+        with open(path, "r", encoding="utf-8", errors="ignore") as fp:
+            for line in fp:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    continue
+                if isinstance(rec, dict):
+                    yield rec
+
+
+class Stats:
+    """流式聚合：内存只与 事件名/会话 数量和 top N 有关，与日志长度无关"""
+
+    def __init__(self, top: int = 10, since: float | None = None, until: float | None = None) -> None:
+        self.top = max(1, top)
+        self.since = since
+        self.until = until
+        self.events = 0
+        self.videos = 0
+        self.likes = 0
+        self.likes_found = 0
+        self.stay_sum = 0.0
+        self.stay_count = 0
+        self.kind_time: dict[str, float] = {k: 0.0 for k in TIME_KINDS}
+        # ev -> [次数, 总耗时, 最大耗时]
+        self.by_event: dict[str, list[float]] = {}
+        # run -> [首个 mono, 最后 mono, 已结束的暂停秒数, 未结束暂停的起点 mono 或 None]
+        self.runs: dict[str, list] = {}
+        self.first_ts: float | None = None
+        self.last_ts: float | None = None
+        self._slowest: list[tuple[float, int, dict]] = []
+        self._seq = 0
+
+    def add(self, rec: dict) -> None:
+        ts = rec.get("ts")
+        if self.since is not None and (ts is None or ts < self.since):
+            return
+        if self.until is not None and (ts is None or ts >= self.until):
+            return
+        self.events += 1
+        if ts is not None:
+            self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+            self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+        run = rec.get("run")
+        mono = rec.get("mono")
+        if run is not None and mono is not None:
+            span = self.runs.get(run)
+            if span is None:
+                span = self.runs[run] = [mono, mono, 0.0, None]
+            else:
+                span[0] = min(span[0], mono)
+                span[1] = max(span[1], mono)
+        else:
+            span = None
+
+        ev = rec.get("ev", "")
+        if span is not None and ev == "pause" and span[3] is None:
+            span[3] = mono
+        elif span is not None and ev == "resume" and span[3] is not None:
+            span[2] += max(0.0, mono - span[3])
+            span[3] = None
+        if ev == "video":
+            self.videos += 1
+        elif ev == "like":
+            self.likes += 1
+            if rec.get("found"):
+                self.likes_found += 1
+        elif ev == "stay":
+            self.stay_sum += float(rec.get("stay", 0.0))
+            self.stay_count += 1
+
+        dur = rec.get("dur")
+        kind = rec.get("kind", "")
+        if dur is None or kind not in self.kind_time:
+            return
+        dur = float(dur)
+        # nested 为外层容器 span，其内部步骤已单独记录，计入会重复
+        if not rec.get("nested"):
+            self.kind_time[kind] += dur
+        agg = self.by_event.setdefault(f"{kind}:{ev}", [0, 0.0, 0.0])
+        agg[0] += 1
+        agg[1] += dur
+        agg[2] = max(agg[2], dur)
+        # 停留本身是刻意等待、容器 span 耗时包含其内部步骤，均不参与“最慢步骤”排名
+        if kind == KIND_SLEEP or rec.get("nested"):
+            return
+        self._seq += 1
+        item = (dur, self._seq, rec)
+        if len(self._slowest) < self.top:
+            heapq.heappush(self._slowest, item)
+        elif dur > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, item)
+
+    def active_seconds(self) -> float:
+        # 扣除暂停区间；暂停后未继续即结束的会话，暂停持续到最后一条事件
+        total = 0.0
+        for first, last, paused, pause_start in self.runs.values():
+            if pause_start is not None:
+                paused += max(0.0, last - pause_start)
+            total += max(0.0, last - first - paused)
+        return total
+
+    def slowest(self) -> list[dict]:
+        return [rec for _, _, rec in sorted(self._slowest, key=lambda x: -x[0])]
+
+    def summary(self) -> dict:
+        active = self.active_seconds()
+        timed = sum(self.kind_time.values())
+        return {
+            "events": self.events,
+            "runs": len(self.runs),
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "active_seconds": round(active, 1),
+            "videos": self.videos,
+            "videos_per_hour": round(self.videos * 3600.0 / active, 2) if active > 0 else 0.0,
+            "avg_stay": round(self.stay_sum / self.stay_count, 2) if self.stay_count else 0.0,
+            "seconds_per_video": round(active / self.videos, 2) if self.videos else 0.0,
+            "likes": self.likes,
+            "likes_found": self.likes_found,
+            "time_split": {k: round(v, 1) for k, v in self.kind_time.items()},
+            "time_split_pct": {k: round(v * 100.0 / timed, 1) if timed > 0 else 0.0 for k, v in self.kind_time.items()},
+            "other_seconds": round(max(0.0, active - timed), 1),
+            "by_event": {
+                k: {"count": int(c), "total": round(t, 2), "avg": round(t / c, 3) if c else 0.0, "max": round(m, 3)}
+                for k, (c, t, m) in sorted(self.by_event.items(), key=lambda kv: -kv[1][1])
+            },
+            "slowest": self.slowest(),
+        }
+
+
+def _fmt_ts(ts: float | None) -> str:
+    if ts is None:
+        return "-"
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(ts))
+
+
+def print_report(s: dict) -> None:
+    print(f"事件数: {s['events']}  会话数: {s['runs']}  时间范围: {_fmt_ts(s['first_ts'])} ~ {_fmt_ts(s['last_ts'])}")
+    print(f"有效运行时长: {s['active_seconds'] / 3600.0:.2f} 小时")
+    print(f"视频数: {s['videos']}  每小时视频数: {s['videos_per_hour']}  平均每条耗时: {s['seconds_per_video']} 秒  平均停留: {s['avg_stay']} 秒")
+    print(f"点赞尝试: {s['likes']}  找到点赞按钮: {s['likes_found']}")
+    print("耗时分布:")
+    for kind in TIME_KINDS:
+        print(f"  {kind:<9} {s['time_split'][kind]:>10.1f} 秒  {s['time_split_pct'][kind]:>5.1f}%")
+    print(f"  {'other':<9} {s['other_seconds']:>10.1f} 秒（未计时部分）")
+    print("按步骤统计（总耗时降序）:")
+    for name, agg in s["by_event"].items():
+        print(f"  {name:<24} 次数 {agg['count']:>7}  总计 {agg['total']:>10.2f}s  平均 {agg['avg']:>7.3f}s  最大 {agg['max']:>7.3f}s")
+    print("最慢步骤:")
+    for rec in s["slowest"]:
+        extra = {k: v for k, v in rec.items() if k not in ("ts", "mono", "run", "ev", "kind", "dur")}
+        print(f"  {rec.get('dur', 0.0):>8.3f}s  {_fmt_ts(rec.get('ts'))}  {rec.get('kind')}:{rec.get('ev')}  {json.dumps(extra, ensure_ascii=False)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Kuaishou journal analyzer")
+    parser.add_argument("paths", nargs="*", default=[JOURNAL_DIR_DEFAULT], help="日志目录或文件，默认 journal 目录")
+    parser.add_argument("--top", dest="top", type=int, default=10, help="列出最慢的步骤数，默认 10")
+    parser.add_argument("--since", dest="since", type=float, default=None, help="仅统计该 Unix 时间戳之后的事件")
+    parser.add_argument("--until", dest="until", type=float, default=None, help="仅统计该 Unix 时间戳之前的事件")
+    parser.add_argument("--json", dest="as_json", action="store_true", help="以 JSON 输出结果")
+    args = parser.parse_args()
+
+    files: list[str] = []
+    for p in args.paths:
+        try:
+            files.extend(iter_journal_files(p))
+        except OSError as e:
+            print(f"读取日志目录失败: {e}")
+            return 1
+    if not files:
+        print("未找到日志文件。")
+        return 2
+
+    stats = Stats(top=args.top, since=args.since, until=args.until)
+    for rec in iter_events(files):
+        stats.add(rec)
+    summary = stats.summary()
+    if args.as_json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print_report(summary)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,5 @@
 import re
 import sys
-import time
 import random
 import subprocess
 import argparse
@@ -13,6 +12,9 @@ try:
     from scripts.core.adb_utils import auto_connect_device, adb_connect, adb_shell, is_app_running, force_stop_app
     from scripts.core.ui import dump_ui_xml, get_screen_size, find_earn_from_xml, close_popup_if_present, handle_network_retry
     from scripts.core.actions import tap, launch_app
+    from scripts.core import journal
+    from scripts.core.control import SessionStopped
+    from scripts.config import JOURNAL_DIR_DEFAULT, JOURNAL_MAX_BYTES, STAY_MIN_DEFAULT, STAY_MAX_DEFAULT, LIKE_THRESHOLD_DEFAULT
 except ModuleNotFoundError:
     # 兼容直接运行脚本：python scripts/kuaishou_to_my.py
     import os as _os, sys as _sys
@@ -22,66 +24,110 @@ except ModuleNotFoundError:
     from scripts.core.adb_utils import auto_connect_device, adb_connect, adb_shell, is_app_running, force_stop_app
     from scripts.core.ui import dump_ui_xml, get_screen_size, find_earn_from_xml, close_popup_if_present, handle_network_retry
     from scripts.core.actions import tap, launch_app
+    from scripts.core import journal
+    from scripts.core.control import SessionStopped
+    from scripts.config import JOURNAL_DIR_DEFAULT, JOURNAL_MAX_BYTES, STAY_MIN_DEFAULT, STAY_MAX_DEFAULT, LIKE_THRESHOLD_DEFAULT
 
 
 TARGET_SERIAL = "192.168.2.12:5001"
 PKG = "com.kuaishou.nebula"
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser(description="Kuaishou auto runner")
-    parser.add_argument("--serial", dest="serial", default=None, help="ADB 设备地址，如 192.168.2.12:5001。缺省则使用脚本内默认值")
-    parser.add_argument("--stay-min", dest="stay_min", type=float, default=10.0, help="每条视频随机停留的最短秒数，默认 3.0")
-    parser.add_argument("--stay-max", dest="stay_max", type=float, default=20.0, help="每条视频随机停留的最长秒数，默认 20.0")
-    parser.add_argument("--like-threshold", dest="like_threshold", type=float, default=45.0, help="当停留秒数大于等于该阈值时尝试点赞，默认 15.0")
-    args = parser.parse_args()
+EXIT_STOPPED = 3
 
-    serial = args.serial or TARGET_SERIAL
-    stay_min = max(0.5, float(args.stay_min))
-    stay_max = max(stay_min, float(args.stay_max))
-    like_threshold = max(0.0, float(args.like_threshold))
+
+def run_session(preferred_serial: Optional[str], stay_min: float, stay_max: float, like_threshold: float, screen_sizes: Optional[dict] = None) -> int:
+    """
+    执行一次完整会话：连接设备 -> 重启快手 -> 进入“去赚钱” -> 刷视频。
+
+    命令行与常驻引擎（engine_daemon.py）共用；screen_sizes 由引擎跨会话缓存，避免重复查询分辨率。
+    返回码：0 正常，1 异常，2 未找到“去赚钱”，3 被停止。
+    """
+    t_start = journal.mark()
+    code = 1
     try:
         # 1) 自动连接设备（优先USB，其次TCP）
-        serial = auto_connect_device(args.serial or TARGET_SERIAL)
+        serial = auto_connect_device(preferred_serial or TARGET_SERIAL)
+        journal.record("session_start", journal.KIND_SESSION, serial=serial, stay_min=stay_min, stay_max=stay_max, like_threshold=like_threshold)
 
         # 2) 启动前检查并停止已运行实例
         if is_app_running(serial, PKG):
-            force_stop_app(serial, PKG)
+            with journal.span("force_stop", journal.KIND_RECOVERY):
+                force_stop_app(serial, PKG)
         # 再启动快手极速版
-        launch_app(serial, PKG)
+        with journal.span("launch_app", journal.KIND_RECOVERY):
+            launch_app(serial, PKG)
 
         # 3) dump 页面，定位底部"去赚钱"文字并点击
-        w, h = get_screen_size(serial)
+        if screen_sizes is not None and serial in screen_sizes:
+            w, h = screen_sizes[serial]
+        else:
+            w, h = get_screen_size(serial)
+            if screen_sizes is not None:
+                screen_sizes[serial] = (w, h)
         xml = dump_ui_xml(serial)
         pos = find_earn_from_xml(xml, h)
         if not pos:
             print("未找到'去赚钱'相关文字（底部区域）。")
-            return 2
+            code = 2
+            return code
         x, y = pos
         print(f"点击'去赚钱'坐标: ({x},{y})")
         tap(serial, x, y)
         print("已点击'去赚钱'。")
 
         # 4) 如有弹窗则尝试自动关闭（点击后先等待 3 秒）
-        time.sleep(3.0)
-        closed = close_popup_if_present(serial, w, h, retries=3, interval=0.8)
+        journal.sleep(3.0, "after_earn")
+        # 弹窗/断网处理内部自带 dump/点击/等待记录，外层 span 标记 nested，分析器不重复计入耗时分布
+        with journal.span("close_popup", journal.KIND_RECOVERY, nested=True) as info:
+            closed = close_popup_if_present(serial, w, h, retries=3, interval=0.8)
+            info["closed"] = bool(closed)
         if closed:
             print("已自动关闭弹窗。")
         else:
             print("未检测到可关闭的弹窗。")
 
         # 5) 处理断网重试弹窗
-        handle_network_retry(serial, w, h)
+        with journal.span("network_retry", journal.KIND_RECOVERY, nested=True):
+            handle_network_retry(serial, w, h)
 
         # 6) 优先执行广告视频任务，若未找到则执行普通看视频任务
         print("尝试执行广告视频任务...")
         if not run_task_ad_look_video(serial, w, h, stay_min, stay_max, like_threshold):
             print("未找到广告视频任务，尝试执行普通看视频任务...")
             run_task_look_video(serial, w, h, stay_min, stay_max, like_threshold)
-        return 0
+        code = 0
+        return code
+    except SessionStopped:
+        print("已停止运行。")
+        code = EXIT_STOPPED
+        return code
     except Exception as e:
         print("执行失败:", e)
+        journal.record("error", journal.KIND_SESSION, err=str(e))
         return 1
+    finally:
+        journal.record("session_end", journal.KIND_SESSION, journal.elapsed(t_start), code=code)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Kuaishou auto runner")
+    parser.add_argument("--serial", dest="serial", default=None, help="ADB 设备地址，如 192.168.2.12:5001。缺省则使用脚本内默认值")
+    parser.add_argument("--stay-min", dest="stay_min", type=float, default=STAY_MIN_DEFAULT, help=f"每条视频随机停留的最短秒数，默认 {STAY_MIN_DEFAULT}")
+    parser.add_argument("--stay-max", dest="stay_max", type=float, default=STAY_MAX_DEFAULT, help=f"每条视频随机停留的最长秒数，默认 {STAY_MAX_DEFAULT}")
+    parser.add_argument("--like-threshold", dest="like_threshold", type=float, default=LIKE_THRESHOLD_DEFAULT, help=f"当停留秒数大于等于该阈值时尝试点赞，默认 {LIKE_THRESHOLD_DEFAULT}")
+    parser.add_argument("--journal-dir", dest="journal_dir", default=JOURNAL_DIR_DEFAULT, help="会话日志目录（JSONL，自动切分），传空字符串则不记录")
+    args = parser.parse_args()
+
+    stay_min = max(0.5, float(args.stay_min))
+    stay_max = max(stay_min, float(args.stay_max))
+    like_threshold = max(0.0, float(args.like_threshold))
+    if args.journal_dir:
+        journal.open_journal(args.journal_dir, max_bytes=JOURNAL_MAX_BYTES)
+    try:
+        return run_session(args.serial, stay_min, stay_max, like_threshold)
+    finally:
+        journal.close_journal()
 
 
 if __name__ == "__main__":
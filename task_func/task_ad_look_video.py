@@ -3,6 +3,7 @@ from typing import Optional, Tuple
 
 from scripts.core.ui import dump_ui_xml, parse_bounds
 from scripts.core.actions import tap, swipe_to_next_video
+from scripts.core import journal, control
 
 
 def _row_overlap(b1: str, b2: str) -> bool:
@@ -74,24 +75,27 @@ def run(serial: str, screen_w: int, screen_h: int, stay_min: float = 3.0, stay_m
                 print(f"点击‘领福利’坐标: ({x},{y})")
                 tap(serial, x, y)
                 print("已点击‘领福利’（广告视频任务）。")
+                journal.record("enter_ad", attempt=attempt + 1)
                 # return True
         # 未找到行或按钮，向下滑继续找
         print("未找到‘刷广告’行或‘领福利’按钮，向下滑一页继续寻找…")
         swipe_to_next_video(serial, screen_w, screen_h)
-        import time as _t
-        _t.sleep(0.8)
+        journal.sleep(0.8, "find_ad")
     print("未找到‘刷广告’行或‘领福利’按钮（已翻多页）")
     # return False
     # 进入广告视频后，沿用通用观看逻辑：随机停留并下滑
-    import time, random
+    import random
     while True:
+        stay_min, stay_max, like_threshold = control.tuning(stay_min, stay_max, like_threshold)
         stay = random.uniform(stay_min, stay_max)
         print(f"[广告] 本视频随机停留时间: {stay:.1f} 秒")
-        time.sleep(stay)
+        journal.record("stay", stay=round(stay, 2), stay_min=stay_min, stay_max=stay_max, like=False, task="ad")
+        journal.sleep(stay, "stay")
         if stay >= like_threshold:
             print(f"[广告] 停留超过 {like_threshold:.1f} 秒（广告视频不点赞，直接滑动）")
         print("[广告] 时间到，开始滑动到下一个视频…")
         swipe_to_next_video(serial, screen_w, screen_h)
+        journal.record("video", task="ad")
     # 正常不会返回
     # return True
 
@@ -1,10 +1,10 @@
 import re
-import time
 import random
 from typing import Optional, Tuple
 
 from scripts.core.ui import dump_ui_xml, parse_bounds
 from scripts.core.actions import tap, swipe_to_next_video
+from scripts.core import journal, control
 
 
 def find_watch_from_xml(xml_text: str, screen_h: int) -> Optional[Tuple[int, int]]:
@@ -85,22 +85,28 @@ def run(serial: str, screen_w: int, screen_h: int, stay_min: float, stay_max: fl
             print(f"点击‘去观看’坐标: ({wx},{wy})")
             tap(serial, wx, wy)
             print("已点击‘去观看’，进入视频播放页面...")
-            time.sleep(1.0)
+            journal.record("enter_watch", attempt=attempt + 1)
+            journal.sleep(1.0, "enter_watch")
             break
-        time.sleep(0.8)
+        journal.sleep(0.8, "find_watch")
     else:
         print("未找到‘去观看’，请检查页面元素或关键词。")
+        journal.record("enter_watch_failed")
         return
 
     # 无限循环：随机停留 + 点赞 + 下滑
     while True:
+        # 常驻引擎中可在线调整参数，下一条视频生效
+        stay_min, stay_max, like_threshold = control.tuning(stay_min, stay_max, like_threshold)
         stay = random.uniform(stay_min, stay_max)
         print(f"本视频随机停留时间: {stay:.1f} 秒")
-        time.sleep(stay)
+        journal.record("stay", stay=round(stay, 2), stay_min=stay_min, stay_max=stay_max, like=stay >= like_threshold)
+        journal.sleep(stay, "stay")
         if stay >= like_threshold:
             print(f"停留超过 {like_threshold:.1f} 秒，尝试点赞…")
             xml_like = dump_ui_xml(serial)
             pos_like = find_like_button_from_xml(xml_like, screen_w, screen_h)
+            journal.record("like", found=pos_like is not None)
             if pos_like:
                 lx, ly = pos_like
                 print(f"点击点赞坐标: ({lx},{ly})")
@@ -109,4 +115,5 @@ def run(serial: str, screen_w: int, screen_h: int, stay_min: float, stay_max: fl
                 print("未找到点赞按钮，跳过点赞。")
         print("时间到，开始滑动到下一个视频…")
         swipe_to_next_video(serial, screen_w, screen_h)
+        journal.record("video", task="look_video")
 